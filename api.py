@@ -0,0 +1,258 @@
+"""Local JSON API for the dashboard aggregates and table reads.
+
+Run with ``python api.py --port 8600`` and poll, for example:
+
+- ``GET /aggregates``                      list of aggregate names
+- ``GET /aggregates/claim_status_mix``     one named aggregate
+- ``GET /tables/food_listings?page=2&page_size=50``
+- ``GET /aggregates/listings_per_city?city=Lake+Regina&city=West+James``
+
+Every response carries an ETag built from the versions of the tables it reads,
+so a repeat poll with ``If-None-Match`` gets a ``304`` without touching the
+aggregate query. Bodies are gzipped when the client accepts it.
+
+The ETags come from trigger-maintained counters; install them once with
+``python api.py --setup`` (and again after replacing a table).
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from db import TABLES, get_engine, install_version_triggers, table_versions
+from partitioning import CITY_COLUMNS
+from queries import AGGREGATES, CITY_AGGREGATES, city_list, scoped_query, tables_for
+
+# --- Settings ---
+VERSION_TTL = 1.0        # seconds a table-version lookup is shared between polls
+RESPONSE_CACHE_SIZE = 256
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_PAGE = 1_000_000
+GZIP_MIN_BYTES = 512
+
+_versions = {"checked": 0.0, "value": {}}
+_versions_lock = threading.Lock()
+_responses = OrderedDict()   # resource key -> (etag, body, gzipped body)
+_responses_lock = threading.Lock()
+
+logger = logging.getLogger("api")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# --- Versions & ETags ---
+def current_versions():
+    """Table versions, refreshed at most once per VERSION_TTL seconds."""
+    with _versions_lock:
+        if time.monotonic() - _versions["checked"] > VERSION_TTL:
+            _versions["value"] = table_versions()
+            _versions["checked"] = time.monotonic()
+        return _versions["value"]
+
+
+def make_etag(key, tables):
+    versions = current_versions()
+    stamp = json.dumps([key] + [[t, versions.get(t)] for t in tables])
+    return '"' + hashlib.sha1(stamp.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        candidate = candidate.removeprefix("W/").replace("-gzip", "")
+        if candidate == etag:
+            return True
+    return False
+
+
+# --- Resources ---
+def to_rows(df):
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def read_aggregate(name, cities):
+    query = scoped_query(name, cities)
+    df = pd.read_sql_query(query, con=get_engine())
+    return {"name": name, "cities": cities, "tables": tables_for(query), "rows": to_rows(df)}
+
+
+def read_table(table, page, page_size, cities):
+    primary_key = TABLES[table]
+    offset = (page - 1) * page_size
+    where = f" WHERE {CITY_COLUMNS[table]} IN {city_list(cities)}" if cities else ""
+    engine = get_engine()
+    total = int(pd.read_sql_query(f"SELECT COUNT(*) AS n FROM {table}{where};", con=engine)["n"][0])
+    df = pd.read_sql_query(
+        f"SELECT * FROM {table}{where} ORDER BY {primary_key} LIMIT {page_size} OFFSET {offset};",
+        con=engine
+    )
+    return {
+        "table": table,
+        "cities": cities,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "pages": max(1, -(-total // page_size)),
+        "rows": to_rows(df)
+    }
+
+
+def int_param(params, name, default, maximum):
+    try:
+        value = int(params.get(name, [default])[0])
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer")
+    if value < 1:
+        raise ApiError(400, f"'{name}' must be at least 1")
+    return min(value, maximum)
+
+
+def resolve(path, params):
+    """Map a request to (cache key, tables read, loader)."""
+    parts = [p for p in path.split("/") if p]
+    cities = sorted(set(params.get("city", [])))
+    city_key = "".join(f"&city={c}" for c in cities)
+
+    if parts == ["aggregates"]:
+        names = {name: tables_for(sql) for name, sql in AGGREGATES.items()}
+        return "aggregates", [], lambda: {"aggregates": names}
+
+    if parts == ["tables"]:
+        return "tables", [], lambda: {"tables": list(TABLES)}
+
+    if len(parts) == 2 and parts[0] == "aggregates":
+        name = parts[1]
+        if name not in AGGREGATES:
+            raise ApiError(404, f"Unknown aggregate '{name}'")
+        if cities and name not in CITY_AGGREGATES:
+            raise ApiError(400, f"Aggregate '{name}' cannot be filtered by city")
+        return f"aggregates/{name}?{city_key}", tables_for(AGGREGATES[name]), lambda: read_aggregate(name, cities)
+
+    if len(parts) == 2 and parts[0] == "tables":
+        table = parts[1]
+        if table not in TABLES:
+            raise ApiError(404, f"Unknown table '{table}'")
+        if cities and table not in CITY_COLUMNS:
+            raise ApiError(400, f"Table '{table}' cannot be filtered by city")
+        page = int_param(params, "page", 1, MAX_PAGE)
+        page_size = int_param(params, "page_size", DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        key = f"tables/{table}?page={page}&page_size={page_size}{city_key}"
+        return key, [table], lambda: read_table(table, page, page_size, cities)
+
+    raise ApiError(404, f"Unknown path '{path}'")
+
+
+def cached_response(key, etag, loader):
+    """Return (body, gzipped body) for a resource, re-running the query only when its ETag changed."""
+    with _responses_lock:
+        hit = _responses.get(key)
+        if hit and hit[0] == etag:
+            _responses.move_to_end(key)
+            return hit[1], hit[2]
+
+    body = json.dumps(loader(), default=str).encode("utf-8")
+    compressed = gzip.compress(body, compresslevel=5) if len(body) >= GZIP_MIN_BYTES else None
+
+    with _responses_lock:
+        _responses[key] = (etag, body, compressed)
+        _responses.move_to_end(key)
+        while len(_responses) > RESPONSE_CACHE_SIZE:
+            _responses.popitem(last=False)
+    return body, compressed
+
+
+# --- HTTP Handler ---
+class Handler(BaseHTTPRequestHandler):
+    server_version = "FoodWastageAPI/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            key, tables, loader = resolve(url.path, parse_qs(url.query))
+            etag = make_etag(key, tables)
+            # The validator depends only on Accept-Encoding, so a 304 carries
+            # the same ETag the 200 would have sent
+            accepts_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+            sent_etag = etag[:-1] + '-gzip"' if accepts_gzip else etag
+
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self.send_response(304)
+                self.send_header("ETag", sent_etag)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return
+
+            body, compressed = cached_response(key, etag, loader)
+        except ApiError as e:
+            return self.send_json(e.status, {"error": e.message})
+        except Exception:
+            # Details (SQL, driver messages) stay in the server log
+            logger.exception("request %s failed", self.path)
+            return self.send_json(503, {"error": "Database unavailable"})
+
+        use_gzip = accepts_gzip and compressed is not None
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", sent_etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+            body = compressed
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve dashboard aggregates as JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--setup", action="store_true",
+                        help="install the table version counters and triggers, then exit")
+    args = parser.parse_args()
+
+    if args.setup:
+        install_version_triggers()
+        print("✅ Table version triggers installed")
+        return
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"✅ Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
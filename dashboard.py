@@ -0,0 +1,155 @@
+"""Shared helpers for the Streamlit pages: cached queries, lazy imports,
+startup timings, the background warm-up and the shared write queue."""
+import importlib
+import logging
+import sys
+import threading
+import time
+
+import streamlit as st
+
+from db import engine_created, get_engine, ping
+from queries import AGGREGATES
+
+logger = logging.getLogger("startup")
+
+# page -> {"imports": seconds, "first_render": seconds}
+STARTUP_TIMINGS = {}
+_timings_lock = threading.Lock()
+_current = threading.local()   # .page: the page the running script (or the warm-up) belongs to
+
+WARM_UP = "Warm-up"
+QUERY_TTL = 60   # seconds; writes made outside this process show up within this window
+PROBE_TTL = 10   # seconds a database_error() result is reused
+
+# --- Queries the warm-up runs so the first visitor hits a filled cache ---
+WARM_UP_QUERIES = [
+    "SELECT * FROM claims;",
+    "SELECT * FROM food_listings;",
+    "SELECT * FROM providers;",
+    "SELECT * FROM receivers;",
+] + [
+    AGGREGATES[name] for name in (
+        "provider_count", "receiver_count", "provider_type_quantity",
+        "receivers_by_type", "food_availability", "listings_per_city"
+    )
+]
+
+
+@st.cache_data(ttl=QUERY_TTL)
+def run_query(query):
+    page = getattr(_current, "page", None)
+    pd = lazy_import("pandas", page)
+    return pd.read_sql_query(query, con=query_engine(page))
+
+
+@st.cache_data(ttl=PROBE_TTL, show_spinner=False)
+def database_error():
+    """None if the database accepts a connection, else the error's class name.
+
+    Shared by all sessions, so while the database is down a page waits for one
+    short probe per PROBE_TTL rather than a full connect timeout per query.
+    """
+    try:
+        query_engine(getattr(_current, "page", None))
+        ping()
+    except Exception as e:
+        return e.__class__.__name__
+    return None
+
+
+def query_engine(page=None):
+    """get_engine(), charging SQLAlchemy, the database driver and engine creation to `page` the first time."""
+    if engine_created():
+        return get_engine()
+    lazy_import("sqlalchemy", page)
+    start = time.perf_counter()
+    engine = get_engine()   # imports the driver
+    if page:
+        _record(page, "imports", time.perf_counter() - start)
+    return engine
+
+
+# --- Startup Instrumentation ---
+def _record(page, phase, seconds):
+    with _timings_lock:
+        timings = STARTUP_TIMINGS.setdefault(page, {"imports": 0.0, "first_render": None})
+        if phase == "imports":
+            timings["imports"] += seconds
+        elif timings["first_render"] is None:
+            timings["first_render"] = seconds
+            logger.info("%s: first render %.3fs (imports %.3fs)", page, seconds, timings["imports"])
+
+
+def lazy_import(module, page=None):
+    """Import a heavy module on first use, charging its import time to `page`."""
+    # import_module waits for an import another thread has in progress, whereas
+    # sys.modules may already hold the partially initialised module; that wait
+    # is charged to `page` too
+    spec = getattr(sys.modules.get(module), "__spec__", None)
+    loaded = module in sys.modules and not getattr(spec, "_initializing", False)
+    start = time.perf_counter()
+    imported = importlib.import_module(module)
+    if not loaded:
+        elapsed = time.perf_counter() - start
+        logger.info("import %s took %.3fs", module, elapsed)
+        if page:
+            _record(page, "imports", elapsed)
+    return imported
+
+
+def start_page(page):
+    """Mark the start of a page's script run and kick off the warm-up."""
+    _current.page = page
+    start_warm_up()
+    return time.perf_counter()
+
+
+def finish_page(page, started):
+    """Record the run time; the first run in the process is the page's first-render cost."""
+    _record(page, "first_render", time.perf_counter() - started)
+    if st.query_params.get("timings"):
+        with st.sidebar.expander("⏱ Startup timings", expanded=True):
+            st.table({
+                page_name: {k: round(v, 3) if v is not None else None for k, v in t.items()}
+                for page_name, t in STARTUP_TIMINGS.items()
+            })
+
+
+# --- Warm-up ---
+def _warm_up():
+    _current.page = WARM_UP
+    start = time.perf_counter()
+    try:
+        engine = query_engine(WARM_UP)
+        # Open a pool's worth of connections so the first sessions don't pay for the handshake
+        connections = [engine.connect() for _ in range(getattr(engine.pool, "size", lambda: 1)())]
+        for conn in connections:
+            conn.close()
+        lazy_import("pandas", WARM_UP)
+        for query in WARM_UP_QUERIES:
+            run_query(query)
+        lazy_import("plotly.express", WARM_UP)
+        logger.info("warm-up finished in %.3fs", time.perf_counter() - start)
+    except Exception as e:
+        logger.warning("warm-up failed: %s", e)
+
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    """Start the background warm-up once per server process."""
+    thread = threading.Thread(target=_warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+# --- Writes ---
+@st.cache_resource(show_spinner=False)
+def get_write_queue():
+    """One write-behind queue per server process, shared by every session.
+
+    Each committed batch clears the cached queries once, instead of once per write.
+    """
+    from writequeue import WriteQueue  # pulls in SQLAlchemy; only pages that write need it
+
+    return WriteQueue(on_flush=lambda tables: run_query.clear())
@@ -0,0 +1,116 @@
+"""Local dataset loader backed by a memory-mapped columnar cache.
+
+The first load of a CSV parses it with pandas and writes the result to an
+uncompressed Arrow IPC file under ``.datacache/``. Later loads memory-map that
+file instead of parsing the text again, so a large partner file comes back in
+milliseconds. The cache records the source's size and mtime and is rebuilt as
+soon as either changes.
+
+    python datacache.py Datasets/*.csv            # build (or refresh) the caches and compare load times
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from validation import sniff_separator
+
+CACHE_DIR = Path(__file__).parent / ".datacache"
+FORMAT_VERSION = "1"
+
+
+def cache_path(source, cache_dir=CACHE_DIR):
+    """One cache file per source path, e.g. .datacache/providers_data-1a2b3c4d.arrow"""
+    source = Path(source).resolve()
+    digest = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:8]
+    return Path(cache_dir) / f"{source.stem}-{digest}.arrow"
+
+
+def _stamp(source):
+    stat = os.stat(source)
+    return {"format": FORMAT_VERSION, "size": str(stat.st_size), "mtime_ns": str(stat.st_mtime_ns)}
+
+
+def _read_stamp(cache):
+    """The stamp stored in a cache file's schema metadata, or None if the file is missing or unreadable."""
+    try:
+        with pa.memory_map(str(cache)) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return {k.decode(): v.decode() for k, v in metadata.items()}
+
+
+# --- Build ---
+def parse_csv(source):
+    """Parse a CSV or tab-separated file. Quoted fields may span lines (e.g. provider addresses)."""
+    df = pd.read_csv(source, sep=sniff_separator(source))
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].astype("string")  # mixed-type columns have no Arrow type
+    return df
+
+
+def build(source, cache_dir=CACHE_DIR):
+    """Parse `source` and (re)write its cache; returns the parsed frame."""
+    stamp = _stamp(source)
+    df = parse_csv(source)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **stamp, "sep": sniff_separator(source)})
+
+    cache = cache_path(source, cache_dir)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    # A temp file of its own per build, so threads or processes refreshing the same source don't collide
+    with tempfile.NamedTemporaryFile(dir=cache.parent, prefix=f"{cache.name}.", suffix=".tmp", delete=False) as tmp:
+        try:
+            with pa.ipc.new_file(tmp, table.schema) as writer:
+                writer.write_table(table)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, cache)  # readers never see a half-written cache
+    return df
+
+
+# --- Load ---
+def is_fresh(source, cache_dir=CACHE_DIR):
+    stamp = _read_stamp(cache_path(source, cache_dir))
+    return stamp is not None and all(stamp.get(k) == v for k, v in _stamp(source).items())
+
+
+def load(source, cache_dir=CACHE_DIR):
+    """Return `source` as a DataFrame, from the memory-mapped cache when it is up to date."""
+    if not is_fresh(source, cache_dir):
+        return build(source, cache_dir)
+    with pa.memory_map(str(cache_path(source, cache_dir))) as mapped:
+        table = pa.ipc.open_file(mapped).read_all()
+    # Numeric columns stay views on the mapped pages; split_blocks avoids copying them into one block
+    return table.to_pandas(split_blocks=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local dataset cache and compare load times.")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, type=Path)
+    args = parser.parse_args()
+
+    for path in args.paths:
+        fresh = is_fresh(path, args.cache_dir)
+        started = time.perf_counter()
+        df = load(path, args.cache_dir)
+        first = time.perf_counter() - started
+
+        started = time.perf_counter()
+        load(path, args.cache_dir)
+        cached = time.perf_counter() - started
+
+        status = "up to date" if fresh else f"built in {first * 1000:.0f} ms"
+        print(f"✅ {path}: {len(df)} rows, cache {status}, cached load {cached * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""Concurrent-session load test for the Streamlit pages.
+
+Starts ``streamlit run app.py`` against a local SQLite copy of ``Datasets/``
+(or an existing database via ``--database-url``), then drives N scripted
+sessions over the app's websocket. Sessions open the home page, switch
+Analysis sections, change the city filter, step through the rows of the CRUD
+datasets and insert, update and delete claims. Each stage of the ramp reports throughput, per-interaction latency
+percentiles, database connections and server memory:
+
+    python loadtest.py --ramp 1,5,10,25 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+import websockets
+from sqlalchemy import create_engine, text
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+import partitioning
+from db import install_version_triggers
+
+ROOT = Path(__file__).resolve().parent
+DATA_DIR = ROOT / "Datasets"
+
+# --- Stand-in database (table -> source CSV) ---
+STAND_IN_TABLES = {
+    "providers": "providers_data.csv",
+    "receivers": "receivers_data.csv",
+    "food_listings": "food_listings_data.csv",
+    "claims": "claims_data.csv"
+}
+
+ANALYSIS_SECTIONS = ["Providers & Receivers, food listing", "Claims", "Overall"]
+CRUD_DATASETS = ["providers", "receivers", "food_listings", "claims"]
+CLAIM_STATUSES = ["Pending", "Completed", "Cancelled"]
+
+# interaction -> relative weight in the scripted mix
+INTERACTIONS = {
+    "home": 2,
+    "analysis_section": 4,
+    "city_filter": 3,
+    "crud_page": 3,
+    "crud_insert": 1,
+    "crud_update": 1,
+    "crud_delete": 1
+}
+
+ERROR_ALERT = 1  # Alert.Format.ERROR
+
+
+def build_stand_in(path):
+    """Load the CSVs under Datasets/ into a SQLite file shaped like the MySQL schema."""
+    engine = create_engine(f"sqlite:///{path}")
+    for table, file_name in STAND_IN_TABLES.items():
+        pd.read_csv(DATA_DIR / file_name).to_sql(table, engine, if_exists="replace", index=False)
+    partitioning.setup(engine)
+    install_version_triggers(engine)  # writes pay for the version counters as they do in production
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, database_url):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py",
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.3)
+    server.terminate()
+    raise RuntimeError("Streamlit server did not become healthy within 60s")
+
+
+# --- Server-side measurements ---
+def server_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def db_connections(pid, database_url, probe_engine):
+    """Open DB connections: file handles on the SQLite file, or MySQL's Threads_connected."""
+    if database_url.startswith("sqlite"):
+        db_path = os.path.realpath(database_url.split("///", 1)[1])
+        try:
+            fds = os.listdir(f"/proc/{pid}/fd")
+        except OSError:
+            return None
+        count = 0
+        for fd in fds:
+            try:
+                if os.readlink(f"/proc/{pid}/fd/{fd}") == db_path:
+                    count += 1
+            except OSError:
+                pass
+        return count
+    with probe_engine.connect() as conn:
+        row = conn.execute(text("SHOW STATUS LIKE 'Threads_connected'")).fetchone()
+    return int(row[1]) - 1  # minus the probe itself
+
+
+# --- Scripted session ---
+class Session:
+    def __init__(self, url, pages, number):
+        self.url = url
+        self.pages = pages
+        self.number = number
+        self.widgets = {}      # label or user key -> widget proto
+        self.rendered = set()  # user keys of the widgets drawn by the last run
+        self.menu_id = None    # Analysis option_menu component
+        self.claims_added = 0
+
+    async def __aenter__(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+
+    async def rerun(self, page, states=()):
+        """Run a page with the given widget states; return (seconds, error message or None)."""
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.pages[page]
+        msg.rerun_script.widget_states.widgets.extend(states)
+        start = time.perf_counter()
+        self.rendered = set()
+        await self.ws.send(msg.SerializeToString())
+
+        error = None
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                name = element.WhichOneof("type")
+                proto = getattr(element, name)
+                if name == "exception":
+                    error = error or f"{proto.type}: {proto.message}"
+                elif name == "alert" and proto.format == ERROR_ALERT:
+                    error = error or proto.body
+                elif getattr(proto, "id", ""):
+                    self.remember(name, proto)
+            elif kind == "script_finished":
+                return time.perf_counter() - start, error
+
+    def remember(self, name, proto):
+        if name == "component_instance":
+            self.menu_id = proto.id
+        user_key = proto.id.rsplit("-", 1)[-1]
+        if user_key != "None":
+            self.widgets[user_key] = proto
+            self.rendered.add(user_key)
+        if getattr(proto, "label", ""):
+            self.widgets[proto.label] = proto
+
+    def state(self, key, **value):
+        widget = self.widgets.get(key)
+        if widget is None:
+            return []
+        ws = BackMsg().rerun_script.widget_states.widgets.add()
+        ws.id = widget.id
+        for field, v in value.items():
+            if field == "string_array_value":
+                ws.string_array_value.data.extend(v)
+            else:
+                setattr(ws, field, v)
+        return [ws]
+
+    def menu(self, section):
+        if self.menu_id is None:
+            return []
+        ws = BackMsg().rerun_script.widget_states.widgets.add()
+        ws.id = self.menu_id
+        ws.json_value = json.dumps(section)
+        return [ws]
+
+    # --- Interactions ---
+    async def home(self):
+        return await self.rerun("home")
+
+    async def analysis_section(self):
+        return await self.rerun("analysis", self.menu(random.choice(ANALYSIS_SECTIONS)))
+
+    async def city_filter(self):
+        """A regional coordinator scoping the listings and claims views to a few cities."""
+        states = self.menu(random.choice(ANALYSIS_SECTIONS[:2]))
+        cities = self.widgets.get("my_cities")
+        if cities is not None and cities.options:
+            picked = random.sample(list(cities.options), min(5, len(cities.options)))
+            states += self.state("my_cities", string_array_value=picked)
+        return await self.rerun("analysis", states)
+
+    def row_index(self, label, row=None):
+        """State for a row-index number input: `row`, or a random row of the current dataset."""
+        widget = self.widgets.get(label)
+        if widget is None:
+            return []
+        if row is None:
+            row = random.randint(0, int(widget.max))
+        return self.state(label, int_value=min(row, int(widget.max)))
+
+    async def crud_page(self):
+        """Pick a dataset and move the update form to one of its rows."""
+        dataset = random.choice(CRUD_DATASETS)
+        states = self.state("crud_dataset_selector", string_value=dataset) + self.row_index("Row index to update")
+        return await self.rerun("crud", states)
+
+    async def crud_insert(self):
+        self.claims_added += 1
+        values = {
+            "Claim_ID": str(1_000_000 + self.number * 100_000 + self.claims_added),
+            "Food_ID": str(random.randint(1, 1000)),
+            "Receiver_ID": str(random.randint(1, 1000)),
+            "Status": random.choice(CLAIM_STATUSES),
+            "Timestamp": time.strftime("%m/%d/%Y %H:%M")
+        }
+        states = self.state("crud_dataset_selector", string_value="claims")
+        for column, value in values.items():
+            states += self.state(f"add_{column}", string_value=value)
+        states += self.state("Add Entry", trigger_value=True)
+        return await self.rerun("crud", states)
+
+    async def crud_update(self):
+        """Save the first claim with a new status.
+
+        The first row stays put while other sessions insert (appended) and delete
+        (the last row), so the values read from the form are the row that is written.
+        """
+        selector = self.state("crud_dataset_selector", string_value="claims")
+        seconds, error = await self.rerun("crud", selector + self.row_index("Row index to update", 0))
+        if error:
+            return seconds, error
+        states = selector + self.row_index("Row index to update", 0)
+        for key in sorted(k for k in self.rendered if k.startswith("upd_")):
+            column = key.removeprefix("upd_")
+            current = self.widgets[key].label.split(" (current: ", 1)[-1][:-1]
+            value = random.choice(CLAIM_STATUSES) if column == "Status" else current
+            states += self.state(key, string_value=value)
+        states += self.state("Update Entry", trigger_value=True)
+        return await self.rerun("crud", states)
+
+    async def crud_delete(self):
+        """Delete the last claim (usually one a session inserted), keeping the table size steady."""
+        selector = self.state("crud_dataset_selector", string_value="claims")
+        seconds, error = await self.rerun("crud", selector)
+        if error:
+            return seconds, error
+        widget = self.widgets.get("del_idx")
+        states = selector + self.state("del_idx", int_value=int(widget.max)) if widget else selector
+        states += self.state("Delete Entry", trigger_value=True)
+        return await self.rerun("crud", states)
+
+    async def learn(self):
+        """First visit of each page so widget ids are known before the mix starts."""
+        results = [("home", await self.home()), ("analysis_section", await self.rerun("analysis"))]
+        results.append(("crud_page", await self.rerun("crud")))
+        results.append(("crud_page", await self.rerun("crud", self.state("crud_dataset_selector", string_value="claims"))))
+        return results
+
+
+async def drive(session, deadline, samples):
+    for name, (seconds, error) in await session.learn():
+        samples.append((name, seconds, error))
+    names, weights = zip(*INTERACTIONS.items())
+    while time.monotonic() < deadline:
+        name = random.choices(names, weights)[0]
+        seconds, error = await getattr(session, name)()
+        samples.append((name, seconds, error))
+
+
+async def run_stage(url, pages, concurrency, duration, pid, database_url, probe_engine):
+    samples = []
+    peaks = {"rss_mb": 0.0, "db_connections": 0}
+    stop = asyncio.Event()
+
+    async def sample():
+        while not stop.is_set():
+            rss = server_rss_mb(pid)
+            conns = await asyncio.to_thread(db_connections, pid, database_url, probe_engine)
+            if rss is not None:
+                peaks["rss_mb"] = max(peaks["rss_mb"], rss)
+            if conns is not None:
+                peaks["db_connections"] = max(peaks["db_connections"], conns)
+            await asyncio.sleep(0.5)
+
+    sampler = asyncio.create_task(sample())
+    start = time.monotonic()
+    deadline = start + duration
+    sessions = [Session(url, pages, number) for number in range(concurrency)]
+    results = await asyncio.gather(*(run_session(s, deadline, samples) for s in sessions), return_exceptions=True)
+    elapsed = time.monotonic() - start
+    stop.set()
+    await sampler
+
+    failures = [r for r in results if isinstance(r, Exception)]
+    return summarize(concurrency, samples, elapsed, peaks, failures)
+
+
+async def run_session(session, deadline, samples):
+    async with session:
+        await drive(session, deadline, samples)
+
+
+# --- Reporting ---
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(concurrency, samples, elapsed, peaks, failures):
+    latencies, errors = {}, {}
+    for name, seconds, error in samples:
+        latencies.setdefault(name, []).append(seconds * 1000)
+        if error:
+            errors.setdefault(name, []).append(error)
+    every = [s * 1000 for _, s, _ in samples]
+    return {
+        "concurrency": concurrency,
+        "interactions": len(samples),
+        "errors": sum(len(e) for e in errors.values()) + len(failures),
+        "session_failures": [repr(f) for f in failures],
+        "throughput_per_s": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(every, 50), 1) if every else None,
+        "p95_ms": round(percentile(every, 95), 1) if every else None,
+        "p99_ms": round(percentile(every, 99), 1) if every else None,
+        "peak_db_connections": peaks["db_connections"],
+        "peak_rss_mb": round(peaks["rss_mb"], 1),
+        "per_interaction": {
+            name: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 1),
+                "p95_ms": round(percentile(values, 95), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+                "errors": len(errors.get(name, [])),
+                "first_error": errors[name][0] if name in errors else None
+            }
+            for name, values in sorted(latencies.items())
+        }
+    }
+
+
+def print_stage(stage):
+    print(
+        f"{stage['concurrency']:>5} sessions | {stage['interactions']:>6} interactions | "
+        f"{stage['throughput_per_s']:>7} /s | p50 {stage['p50_ms']} ms | p95 {stage['p95_ms']} ms | "
+        f"p99 {stage['p99_ms']} ms | errors {stage['errors']} | "
+        f"db conns {stage['peak_db_connections']} | rss {stage['peak_rss_mb']} MB"
+    )
+    for name, stats in stage["per_interaction"].items():
+        print(f"        {name:<17} n={stats['count']:<6} p50 {stats['p50_ms']} ms | "
+              f"p95 {stats['p95_ms']} ms | p99 {stats['p99_ms']} ms | errors {stats['errors']}")
+        if stats["first_error"]:
+            print(f"            first error: {stats['first_error'][:200]}")
+    for failure in stage["session_failures"]:
+        print(f"        session failed: {failure[:200]}")
+
+
+async def discover_pages(url):
+    """Map the harness's page names to Streamlit page script hashes."""
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        await ws.send(BackMsg(rerun_script={}).SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await ws.recv())
+            if fwd.WhichOneof("type") == "navigation":
+                by_path = {p.url_pathname: p.page_script_hash for p in fwd.navigation.app_pages}
+                return {
+                    "home": by_path[""],
+                    "analysis": by_path["Analysis"],
+                    "crud": by_path["CRUD_operations"]
+                }
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or build_stand_in(os.path.join(tmp, "stand_in.db"))
+        probe_engine = None if database_url.startswith("sqlite") else create_engine(database_url)
+        port = args.port or free_port()
+        server = start_server(port, database_url)
+        try:
+            url = f"ws://127.0.0.1:{port}/_stcore/stream"
+            pages = await discover_pages(url)
+            print(f"✅ Server pid {server.pid} on port {port}, database {database_url}")
+            stages = []
+            for concurrency in args.ramp:
+                stage = await run_stage(url, pages, concurrency, args.duration, server.pid, database_url, probe_engine)
+                print_stage(stage)
+                stages.append(stage)
+            if args.json:
+                Path(args.json).write_text(json.dumps(stages, indent=2))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp concurrent scripted sessions against the Streamlit app.")
+    parser.add_argument("--ramp", default="1,5,10,25",
+                        type=lambda s: [int(n) for n in s.split(",")],
+                        help="comma-separated session counts, one stage each")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per stage")
+    parser.add_argument("--database-url", help="database to test against (default: SQLite copy of Datasets/)")
+    parser.add_argument("--port", type=int, help="port for the Streamlit server (default: any free port)")
+    parser.add_argument("--json", help="also write the stage results to this file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
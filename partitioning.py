@@ -0,0 +1,262 @@
+"""City partitioning for ``food_listings`` and ``claims``.
+
+On MySQL both tables are partitioned with ``PARTITION BY KEY(Location)``, so a
+query filtered with ``Location IN (...)`` only reads the partitions holding
+those cities. ``claims`` gets a denormalised ``Location`` column that triggers
+keep in step with its food listing. Other backends (the SQLite stand-in) get
+the column and triggers but no native partitions.
+
+    python partitioning.py setup
+    python partitioning.py stats food_listings
+    python partitioning.py which claims "New Jessica"
+    python partitioning.py reload food_listings "New Jessica" Datasets/food_listings_data.csv
+    python partitioning.py archive claims "New Jessica"
+    python partitioning.py truncate claims "New Jessica"
+
+Archiving and truncating work per city, not per partition: a KEY partition
+such as ``p3`` is a hash bucket holding whichever unrelated cities hash there.
+"""
+import argparse
+import re
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from db import get_engine
+
+PARTITIONS = 16
+
+# --- Partitioned tables (table -> city column) ---
+CITY_COLUMNS = {
+    "food_listings": "Location",
+    "claims": "Location"
+}
+
+_MYSQL_TRIGGERS = {
+    "claims_location_insert": """
+        CREATE TRIGGER claims_location_insert BEFORE INSERT ON claims FOR EACH ROW
+        SET NEW.Location = (SELECT Location FROM food_listings WHERE Food_ID = NEW.Food_ID LIMIT 1)
+    """,
+    "claims_location_update": """
+        CREATE TRIGGER claims_location_update BEFORE UPDATE ON claims FOR EACH ROW
+        SET NEW.Location = (SELECT Location FROM food_listings WHERE Food_ID = NEW.Food_ID LIMIT 1)
+    """,
+    "food_listings_location_update": """
+        CREATE TRIGGER food_listings_location_update AFTER UPDATE ON food_listings FOR EACH ROW
+        UPDATE claims SET Location = NEW.Location WHERE Food_ID = NEW.Food_ID AND NOT (Location <=> NEW.Location)
+    """
+}
+
+_SQLITE_TRIGGERS = {
+    "claims_location_insert": """
+        CREATE TRIGGER claims_location_insert AFTER INSERT ON claims BEGIN
+            UPDATE claims SET Location = (SELECT Location FROM food_listings WHERE Food_ID = NEW.Food_ID LIMIT 1)
+            WHERE rowid = NEW.rowid;
+        END
+    """,
+    "claims_location_update": """
+        CREATE TRIGGER claims_location_update AFTER UPDATE OF Food_ID ON claims BEGIN
+            UPDATE claims SET Location = (SELECT Location FROM food_listings WHERE Food_ID = NEW.Food_ID LIMIT 1)
+            WHERE rowid = NEW.rowid;
+        END
+    """,
+    "food_listings_location_update": """
+        CREATE TRIGGER food_listings_location_update AFTER UPDATE OF Location ON food_listings BEGIN
+            UPDATE claims SET Location = NEW.Location WHERE Food_ID = NEW.Food_ID;
+        END
+    """
+}
+
+
+def _check_table(table):
+    if table not in CITY_COLUMNS:
+        raise ValueError(f"'{table}' is not a city-partitioned table ({', '.join(CITY_COLUMNS)})")
+
+
+def _check_city(conn, table, city):
+    """Refuse cities with no rows, and say why when given a partition name instead."""
+    column = CITY_COLUMNS[table]
+    count = conn.execute(text(f"SELECT COUNT(*) FROM {table} WHERE {column} = :city"), {"city": city}).scalar()
+    if count:
+        return count
+    if re.fullmatch(r"p\d+", city):
+        raise ValueError(f"'{city}' looks like a partition name; partitions are hash buckets of unrelated "
+                         "cities, so pass the city to archive or truncate")
+    raise ValueError(f"No {table} rows for city '{city}'")
+
+
+def _require_mysql(engine):
+    if engine.dialect.name != "mysql":
+        raise RuntimeError("Native partitions are only available on MySQL")
+
+
+def _partition_count(conn, table):
+    return conn.execute(text(
+        "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+    ), {"table": table}).scalar()
+
+
+# --- Setup ---
+def setup(engine=None, partitions=PARTITIONS):
+    """Add and backfill claims.Location, install the sync triggers and partition both tables."""
+    engine = engine or get_engine()
+    mysql = engine.dialect.name == "mysql"
+
+    with engine.begin() as conn:
+        if "Location" not in {c["name"] for c in inspect(conn).get_columns("claims")}:
+            conn.execute(text("ALTER TABLE claims ADD COLUMN Location VARCHAR(255)"))
+        # the backfill and the triggers look listings and claims up by Food_ID
+        for table in CITY_COLUMNS:
+            if f"idx_{table}_food_id" not in {i["name"] for i in inspect(conn).get_indexes(table)}:
+                conn.execute(text(f"CREATE INDEX idx_{table}_food_id ON {table} (Food_ID)"))
+        conn.execute(text(
+            "UPDATE claims SET Location = "
+            "(SELECT f.Location FROM food_listings f WHERE f.Food_ID = claims.Food_ID LIMIT 1) "
+            "WHERE Location IS NULL"
+        ))
+        for name, ddl in (_MYSQL_TRIGGERS if mysql else _SQLITE_TRIGGERS).items():
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(text(ddl))
+
+    if not mysql:
+        return
+
+    # DDL commits implicitly on MySQL, so each table is altered on its own
+    with engine.connect() as conn:
+        for table, column in CITY_COLUMNS.items():
+            # KEY partitioning and indexes need a bounded type (to_sql creates TEXT columns)
+            conn.execute(text(f"ALTER TABLE {table} MODIFY {column} VARCHAR(255)"))
+            indexes = {i["name"] for i in inspect(conn).get_indexes(table)}
+            if f"idx_{table}_{column.lower()}" not in indexes:
+                conn.execute(text(f"CREATE INDEX idx_{table}_{column.lower()} ON {table} ({column})"))
+            if _partition_count(conn, table) != partitions:
+                conn.execute(text(f"ALTER TABLE {table} PARTITION BY KEY({column}) PARTITIONS {partitions}"))
+
+
+# --- Maintenance ---
+def partition_stats(table):
+    """Rows and data size per partition."""
+    _check_table(table)
+    engine = get_engine()
+    _require_mysql(engine)
+    return pd.read_sql_query(text(
+        "SELECT PARTITION_NAME, TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH "
+        "FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table ORDER BY PARTITION_ORDINAL_POSITION"
+    ), con=engine, params={"table": table})
+
+
+def partition_of(table, city):
+    """Name of the partition that holds a city's rows, as chosen by MySQL's pruning."""
+    _check_table(table)
+    engine = get_engine()
+    _require_mysql(engine)
+    with engine.connect() as conn:
+        row = conn.execute(
+            text(f"EXPLAIN SELECT * FROM {table} WHERE {CITY_COLUMNS[table]} = :city"), {"city": city}
+        ).mappings().first()
+    return row["partitions"]
+
+
+def reload_city(table, city, df):
+    """Replace one city's rows with those in `df`; only that city's partition is touched."""
+    _check_table(table)
+    column = CITY_COLUMNS[table]
+    engine = get_engine()
+
+    if column in df.columns:
+        rows = df[df[column] == city]
+    else:
+        # claims files carry no city; pick the claims whose listing is in this city
+        food_ids = pd.read_sql_query(
+            text("SELECT Food_ID FROM food_listings WHERE Location = :city"), con=engine, params={"city": city}
+        )["Food_ID"]
+        rows = df[df["Food_ID"].isin(food_ids)]
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {table} WHERE {column} = :city"), {"city": city})
+        rows.to_sql(table, conn, if_exists="append", index=False)
+        if table == "food_listings":
+            # the triggers only follow UPDATEs, so re-sync the claims of the old and new listings
+            conn.execute(text(
+                "UPDATE claims SET Location = "
+                "(SELECT f.Location FROM food_listings f WHERE f.Food_ID = claims.Food_ID LIMIT 1) "
+                "WHERE Location = :city "
+                "OR Food_ID IN (SELECT Food_ID FROM food_listings WHERE Location = :city)"
+            ), {"city": city})
+    return len(rows)
+
+
+def archive_city(table, city):
+    """Move one city's rows into `<table>_archive`; only that city's partition is touched."""
+    _check_table(table)
+    column = CITY_COLUMNS[table]
+    engine = get_engine()
+    archive = f"{table}_archive"
+    if not inspect(engine).has_table(archive):
+        # Same columns, no partitioning or triggers (CREATE ... AS SELECT commits on its own on MySQL)
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE TABLE {archive} AS SELECT * FROM {table} WHERE 1 = 0"))
+
+    with engine.begin() as conn:
+        count = _check_city(conn, table, city)
+        conn.execute(text(f"INSERT INTO {archive} SELECT * FROM {table} WHERE {column} = :city"), {"city": city})
+        conn.execute(text(f"DELETE FROM {table} WHERE {column} = :city"), {"city": city})
+    return archive, count
+
+
+def truncate_city(table, city):
+    """Delete one city's rows; only that city's partition is touched."""
+    _check_table(table)
+    with get_engine().begin() as conn:
+        count = _check_city(conn, table, city)
+        conn.execute(text(f"DELETE FROM {table} WHERE {CITY_COLUMNS[table]} = :city"), {"city": city})
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the city partitions of food_listings and claims.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    setup_cmd = commands.add_parser("setup", help="add claims.Location and partition both tables")
+    setup_cmd.add_argument("--partitions", type=int, default=PARTITIONS)
+
+    commands.add_parser("stats", help="rows per partition").add_argument("table")
+
+    which_cmd = commands.add_parser("which", help="partition holding a city")
+    which_cmd.add_argument("table")
+    which_cmd.add_argument("city")
+
+    reload_cmd = commands.add_parser("reload", help="replace one city's rows from a CSV file")
+    reload_cmd.add_argument("table")
+    reload_cmd.add_argument("city")
+    reload_cmd.add_argument("csv")
+
+    for name, help_text in [("archive", "move one city's rows into <table>_archive"),
+                            ("truncate", "delete one city's rows")]:
+        cmd = commands.add_parser(name, help=help_text)
+        cmd.add_argument("table")
+        cmd.add_argument("city")
+
+    args = parser.parse_args()
+    if args.command == "setup":
+        setup(partitions=args.partitions)
+        print("✅ food_listings and claims are partitioned by city")
+    elif args.command == "stats":
+        print(partition_stats(args.table).to_string(index=False))
+    elif args.command == "which":
+        print(partition_of(args.table, args.city))
+    elif args.command == "reload":
+        count = reload_city(args.table, args.city, pd.read_csv(args.csv))
+        print(f"✅ Reloaded {count} rows for '{args.city}' into {args.table}")
+    elif args.command == "archive":
+        archive, count = archive_city(args.table, args.city)
+        print(f"✅ Moved {count} {args.table} rows for '{args.city}' to {archive}")
+    elif args.command == "truncate":
+        count = truncate_city(args.table, args.city)
+        print(f"✅ Deleted {count} {args.table} rows for '{args.city}'")
+
+
+if __name__ == "__main__":
+    main()
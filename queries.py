@@ -0,0 +1,144 @@
+import re
+
+# --- Named Aggregates (shared by the dashboard and the JSON API) ---
+AGGREGATES = {
+    # Providers, receivers & food listings
+    "provider_count": "SELECT COUNT(Type) AS number_of_providers FROM providers;",
+    "receiver_count": "SELECT COUNT(Type) AS number_of_receivers FROM receivers;",
+    "provider_type_quantity": "SELECT Provider_Type, SUM(Quantity) AS Total_Quantity FROM food_listings GROUP BY Provider_Type;",
+    "receivers_by_type": "SELECT Type, COUNT(Type) AS number_of_recievers FROM receivers GROUP BY Type;",
+    "food_availability": "SELECT Food_Name AS food_name, COUNT(Food_Name) AS avail_food_count FROM food_listings GROUP BY Food_Name ORDER BY avail_food_count DESC;",
+    "listings_per_city": "SELECT Location AS City, COUNT(Food_Name) AS food_list FROM food_listings GROUP BY Location ORDER BY food_list DESC;",
+
+    # Claims
+    "top_claimed_foods": """
+        SELECT f.Food_Name, COUNT(c.Claim_ID) AS no_food_claims
+        FROM food_listings f
+        JOIN claims c ON c.Food_ID = f.Food_ID
+        GROUP BY f.Food_Name
+        ORDER BY no_food_claims DESC
+    """,
+    "provider_completion": """
+        SELECT f.Provider_Type AS Provider, ROUND(AVG(IF(c.Status = 'Completed', 1, 0)), 2) AS average_completed_claims
+        FROM claims c JOIN food_listings f ON c.Food_ID = f.Food_ID
+        GROUP BY f.Provider_Type ORDER BY average_completed_claims DESC
+    """,
+    "claim_status_mix": "SELECT Status, COUNT(*) * 100.0 / (SELECT COUNT(*) FROM claims) AS percentage FROM claims GROUP BY Status",
+    "claim_completion_rate": "SELECT 100.0 * COUNT((CASE WHEN Status = 'Completed' THEN 1 END)) / COUNT(*) AS avg_food_claimed_per_reciever FROM claims",
+    "meal_type_claims": """
+        SELECT f.Meal_Type, COUNT(c.Status) AS no_of_claims
+        FROM food_listings f JOIN claims c ON f.Food_ID = c.Food_ID
+        WHERE c.Status = 'Completed'
+        GROUP BY f.Meal_Type ORDER BY no_of_claims DESC
+    """,
+    "provider_quantity": "SELECT Provider_Type AS Provider, SUM(Quantity) AS total_food_provided FROM food_listings GROUP BY Provider_Type ORDER BY total_food_provided DESC",
+    "expiring_items": """
+        SELECT Food_Name, MIN(STR_TO_DATE(Expiry_Date, '%%m/%%d/%%Y')) AS Earliest_Expiry
+        FROM food_listings
+        WHERE Expiry_Date IS NOT NULL AND Expiry_Date <> ''
+        GROUP BY Food_Name ORDER BY Earliest_Expiry ASC
+    """,
+
+    # Overall
+    "receiver_type_share": """
+    SELECT
+        Type AS receiver_type,
+        COUNT(*) * 100.0 / (SELECT COUNT(*) FROM receivers) AS percentage_share
+    FROM receivers
+    GROUP BY Type;
+    """,
+    "provider_type_share": """
+    SELECT
+        Type AS provider_type,
+        COUNT(*) * 100.0 / (SELECT COUNT(*) FROM providers) AS percentage_share
+    FROM providers
+    GROUP BY Type;
+    """,
+    "meal_type_success": """
+    SELECT
+        f.Meal_Type,
+        CAST(SUM(CASE WHEN c.Status = 'Completed' THEN 1 ELSE 0 END) AS REAL) * 100 /
+        (SELECT COUNT(*) FROM claims c WHERE Status = 'Completed') AS success_percentage
+    FROM claims c
+    JOIN food_listings f ON c.Food_ID = f.Food_ID
+    GROUP BY f.Meal_Type
+    ORDER BY success_percentage DESC;
+    """,
+    "provider_success_rate": """
+    SELECT
+        f.Provider_Type,
+        ROUND(SUM(CASE WHEN c.Status = 'Completed' THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS success_rate
+    FROM food_listings f
+    JOIN claims c ON f.Food_ID = c.Food_ID
+    GROUP BY f.Provider_Type
+    ORDER BY success_rate DESC;
+    """,
+    "vegan_by_meal": "SELECT Meal_Type, COUNT(Food_Type) AS count_vegan FROM food_listings WHERE Food_Type = 'Vegan' GROUP BY Meal_Type",
+    "vegetarian_by_meal": "SELECT Meal_Type, COUNT(Food_Type) AS count_vegetarian FROM food_listings WHERE Food_Type = 'Vegetarian' GROUP BY Meal_Type",
+    "non_veg_by_meal": "SELECT Meal_Type, COUNT(Food_Type) AS count_non_veg FROM food_listings WHERE Food_Type = 'Non-Vegetarian' GROUP BY Meal_Type",
+}
+
+# --- City-scoped Aggregates ---
+# Same results as AGGREGATES restricted to `{cities}`, a literal list from city_list().
+# Filtering on the partition column lets MySQL prune food_listings/claims to those cities.
+CITY_AGGREGATES = {
+    "provider_type_quantity": "SELECT Provider_Type, SUM(Quantity) AS Total_Quantity FROM food_listings WHERE Location IN {cities} GROUP BY Provider_Type;",
+    "food_availability": "SELECT Food_Name AS food_name, COUNT(Food_Name) AS avail_food_count FROM food_listings WHERE Location IN {cities} GROUP BY Food_Name ORDER BY avail_food_count DESC;",
+    "listings_per_city": "SELECT Location AS City, COUNT(Food_Name) AS food_list FROM food_listings WHERE Location IN {cities} GROUP BY Location ORDER BY food_list DESC;",
+    "top_claimed_foods": """
+        SELECT f.Food_Name, COUNT(c.Claim_ID) AS no_food_claims
+        FROM food_listings f
+        JOIN claims c ON c.Food_ID = f.Food_ID
+        WHERE f.Location IN {cities} AND c.Location IN {cities}
+        GROUP BY f.Food_Name
+        ORDER BY no_food_claims DESC
+    """,
+    "provider_completion": """
+        SELECT f.Provider_Type AS Provider, ROUND(AVG(IF(c.Status = 'Completed', 1, 0)), 2) AS average_completed_claims
+        FROM claims c JOIN food_listings f ON c.Food_ID = f.Food_ID
+        WHERE f.Location IN {cities} AND c.Location IN {cities}
+        GROUP BY f.Provider_Type ORDER BY average_completed_claims DESC
+    """,
+    "claim_status_mix": "SELECT Status, COUNT(*) * 100.0 / (SELECT COUNT(*) FROM claims WHERE Location IN {cities}) AS percentage FROM claims WHERE Location IN {cities} GROUP BY Status",
+    "claim_completion_rate": "SELECT 100.0 * COUNT((CASE WHEN Status = 'Completed' THEN 1 END)) / COUNT(*) AS avg_food_claimed_per_reciever FROM claims WHERE Location IN {cities}",
+    "meal_type_claims": """
+        SELECT f.Meal_Type, COUNT(c.Status) AS no_of_claims
+        FROM food_listings f JOIN claims c ON f.Food_ID = c.Food_ID
+        WHERE c.Status = 'Completed' AND f.Location IN {cities} AND c.Location IN {cities}
+        GROUP BY f.Meal_Type ORDER BY no_of_claims DESC
+    """,
+    "provider_quantity": "SELECT Provider_Type AS Provider, SUM(Quantity) AS total_food_provided FROM food_listings WHERE Location IN {cities} GROUP BY Provider_Type ORDER BY total_food_provided DESC",
+    "expiring_items": """
+        SELECT Food_Name, MIN(STR_TO_DATE(Expiry_Date, '%%m/%%d/%%Y')) AS Earliest_Expiry
+        FROM food_listings
+        WHERE Expiry_Date IS NOT NULL AND Expiry_Date <> '' AND Location IN {cities}
+        GROUP BY Food_Name ORDER BY Earliest_Expiry ASC
+    """,
+}
+
+CITY_OPTIONS = "SELECT DISTINCT Location AS City FROM food_listings ORDER BY City;"
+
+
+def city_list(cities):
+    """Render cities as a quoted SQL list, e.g. ('Lake Regina', 'West James')."""
+    from sqlalchemy import String
+    from db import get_engine
+
+    dialect = get_engine().dialect
+    quote = String().literal_processor(dialect)
+    values = ", ".join(quote(str(city)) for city in cities)
+    if dialect.paramstyle in ("format", "pyformat"):
+        values = values.replace("%", "%%")  # pandas passes the query through the driver's % formatting
+    return f"({values})"
+
+
+def scoped_query(name, cities=None):
+    """SQL for a named aggregate, limited to `cities` when given."""
+    if not cities:
+        return AGGREGATES[name]
+    return CITY_AGGREGATES[name].format(cities=city_list(sorted(cities)))
+
+
+def tables_for(query):
+    """Return the sorted list of tables a query reads from."""
+    return sorted({t.lower() for t in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)", query, flags=re.IGNORECASE)})
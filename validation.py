@@ -0,0 +1,211 @@
+"""Validation and normalisation stage for provider and receiver files.
+
+Every rule runs on whole columns with pandas string methods, so large partner
+files are processed chunk by chunk without a per-row Python loop. Rows that
+fail a rule are quarantined with the reasons instead of being loaded.
+
+    python validation.py Datasets/providers_data.csv
+    python validation.py partner_receivers.csv --chunksize 500000 --load
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# --- Dataset Rules ---
+RULES = {
+    "providers": {
+        "id": "Provider_ID",
+        "required": ["Provider_ID", "Name", "Type", "City", "Contact"],
+        "types": {"Supermarket", "Grocery Store", "Restaurant", "Catering Service"}
+    },
+    "receivers": {
+        "id": "Receiver_ID",
+        "required": ["Receiver_ID", "Name", "Type", "City", "Contact"],
+        "types": {"NGO", "Charity", "Shelter", "Individual"}
+    }
+}
+
+CHUNKSIZE = 250_000
+
+
+def sniff_separator(path):
+    """Detect tab-separated exports such as Providers.csv from the header line."""
+    with open(path, encoding="utf-8", newline="") as f:
+        header = f.readline()
+    return "\t" if header.count("\t") > header.count(",") else ","
+
+
+def detect_kind(columns):
+    for kind, rules in RULES.items():
+        if rules["id"] in columns:
+            return kind
+    raise ValueError(f"Cannot tell providers from receivers by columns: {list(columns)}")
+
+
+# --- Normalisation (vectorised over whole columns) ---
+def normalize_text(series):
+    return series.astype("string").str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def normalize_address(series):
+    """Fold embedded newlines into ', ' and collapse whitespace."""
+    return (series.astype("string")
+            .str.replace(r"\s*[\r\n]+\s*", ", ", regex=True)
+            .str.replace(r"[ \t]+", " ", regex=True)
+            .str.strip(" ,"))
+
+
+def normalize_phone(series):
+    """Normalise North American numbers to +1-XXX-XXX-XXXX[ xEXT]; invalid numbers become <NA>.
+
+    Handles the formats found in the datasets: +1-600-220-0480, 001-517-295-2206,
+    (955)922-5295, 761.042.1570, 8296491111 and trailing 'x1234' extensions.
+    """
+    # Plain replace/contains patterns (no str.extract, no lookarounds) stay inside
+    # pyarrow's regex kernels instead of falling back to a per-row Python loop.
+    raw = series.astype("string").str.strip()
+    has_ext = raw.str.contains(r"(?:x|ext\.?)\s*\d+$", regex=True)
+    ext = raw.str.replace(r"^.*?(?:x|ext\.?)\s*(\d+)$", r"\1", regex=True)
+    digits = raw.str.replace(r"\s*(?:x|ext\.?)\s*\d+$", "", regex=True).str.replace(r"\D", "", regex=True)
+    digits = digits.str.replace(r"^(?:001|1)(\d{10})$", r"\1", regex=True)
+    valid = digits.str.len() == 10
+
+    phone = "+1-" + digits.str[:3] + "-" + digits.str[3:6] + "-" + digits.str[6:]
+    phone = phone.where(~has_ext.fillna(False), phone + " x" + ext)
+    return phone.where(valid.fillna(False))
+
+
+def _key(series):
+    """Lower-case alphanumeric blocking key: 'Miller-Black ' -> 'millerblack'."""
+    return series.str.lower().str.replace(r"[^0-9a-z]", "", regex=True)
+
+
+# --- Validation ---
+def _add_reason(reasons, mask, text):
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return reasons
+    text = text if isinstance(text, pd.Series) else pd.Series(text, index=reasons.index)
+    return reasons.where(~mask, reasons + "; " + text)
+
+
+def validate(df, kind=None, seen=None):
+    """Normalise a provider/receiver frame and split it into (clean, quarantine).
+
+    Duplicates are found with two blocking keys, normalised name + city and
+    phone + name prefix; the first row of each block is kept. Pass the same
+    `seen` dict for every chunk of a file so duplicates across chunks are
+    caught too. Quarantined rows carry a `Reason` column.
+    """
+    kind = kind or detect_kind(df.columns)
+    rules = RULES[kind]
+    id_col = rules["id"]
+    seen = {} if seen is None else seen
+
+    out = df.copy()
+    for col in ("Name", "Type", "City"):
+        out[col] = normalize_text(out[col])
+    if "Address" in out.columns:
+        out["Address"] = normalize_address(out["Address"])
+    raw_contact = out["Contact"].astype("string")
+    out["Contact"] = normalize_phone(raw_contact)
+    ids = pd.to_numeric(out[id_col], errors="coerce")
+    # Int64 keeps '1' as '1' even in a chunk where a missing ID turned the column to float
+    int_ids = ids.where(ids % 1 == 0).astype("Int64")
+
+    reasons = pd.Series("", index=out.index, dtype="string")
+    for col in rules["required"]:
+        if col != "Contact":
+            reasons = _add_reason(reasons, out[col].isna() | (out[col].astype("string") == ""), f"missing {col}")
+    reasons = _add_reason(reasons, ids.isna() | (ids <= 0) | (ids % 1 != 0), f"invalid {id_col}")
+    reasons = _add_reason(reasons, out["Type"].notna() & ~out["Type"].isin(rules["types"]),
+                          "unknown Type '" + out["Type"].fillna("") + "'")
+    reasons = _add_reason(reasons, out["Contact"].isna(),
+                          "invalid Contact '" + raw_contact.fillna("") + "'")
+
+    # --- Duplicates: exact ID, then the two blocking keys ---
+    # Only rows that passed every other rule can be the row a duplicate is kept against.
+    # Type (and Address, where the file has one) is part of the name key, so two
+    # branches of a chain, or a restaurant and a shop sharing a name, stay distinct.
+    name_key, city_key, phone = _key(out["Name"].fillna("")), _key(out["City"].fillna("")), out["Contact"]
+    place_key, place_label = name_key + "|" + city_key + "|" + _key(out["Type"].fillna("")), "name+type+city"
+    if "Address" in out.columns:
+        place_key, place_label = place_key + "|" + _key(out["Address"].fillna("")), place_label + "+address"
+    blocks = [
+        ("id", int_ids.astype("string")),
+        (place_label, place_key.where((name_key != "") & (city_key != ""))),
+        ("phone+name", (phone + "|" + name_key.str[:4]).where(phone.notna() & (name_key != ""))),
+    ]
+    row_ids = out[id_col].astype("string")
+    eligible = reasons == ""
+    for label, key in blocks:
+        key = key.where(eligible)
+        store = seen.setdefault(label, {})
+        earlier = key.map(store.get, na_action="ignore")          # kept row from an earlier chunk
+        first_in_chunk = row_ids.groupby(key).transform("first")  # kept row within this chunk
+        dup = key.notna() & (earlier.notna() | key.duplicated())
+        reasons = _add_reason(reasons, dup, f"duplicate ({label}) of {id_col} " + earlier.fillna(first_in_chunk))
+        kept = key.notna() & ~dup
+        store.update(zip(key[kept].tolist(), row_ids[kept].tolist()))
+        eligible &= ~dup
+
+    bad = reasons != ""
+    if id_col in out.columns:
+        out[id_col] = int_ids
+    clean = out[~bad]
+    quarantine = df[bad].copy()
+    quarantine["Reason"] = reasons[bad].str.removeprefix("; ")
+    return clean, quarantine
+
+
+def validate_file(path, kind=None, chunksize=CHUNKSIZE):
+    """Yield (clean, quarantine) per chunk of a provider/receiver CSV or TSV file."""
+    seen = {}
+    reader = pd.read_csv(path, sep=sniff_separator(path), dtype=str, keep_default_na=False,
+                         na_values=[""], chunksize=chunksize)
+    for chunk in reader:
+        yield validate(chunk, kind, seen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and normalise a provider/receiver file.")
+    parser.add_argument("path")
+    parser.add_argument("--kind", choices=list(RULES), help="default: detected from the ID column")
+    parser.add_argument("--out-dir", default="validated")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--load", action="store_true", help="replace the database table with the clean rows")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(args.path).stem
+    clean_path, quarantine_path = out_dir / f"{stem}_clean.csv", out_dir / f"{stem}_quarantine.csv"
+
+    engine = None
+    if args.load:
+        from db import get_engine, install_version_triggers
+        engine = get_engine()
+
+    totals = {"clean": 0, "quarantined": 0}
+    for i, (clean, quarantine) in enumerate(validate_file(args.path, args.kind, args.chunksize)):
+        first = i == 0
+        clean.to_csv(clean_path, mode="w" if first else "a", header=first, index=False)
+        quarantine.to_csv(quarantine_path, mode="w" if first else "a", header=first, index=False)
+        if engine is not None:
+            table = args.kind or detect_kind(clean.columns)
+            clean.to_sql(table, engine, if_exists="replace" if first else "append", index=False)
+        totals["clean"] += len(clean)
+        totals["quarantined"] += len(quarantine)
+
+    if engine is not None:
+        # replacing the table dropped its version triggers
+        install_version_triggers(engine)
+
+    print(f"✅ {totals['clean']} clean rows -> {clean_path}")
+    print(f"⚠ {totals['quarantined']} quarantined rows -> {quarantine_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Write-behind queue that batches CRUD operations from every session.
+
+Operations are collected for up to `flush_interval` seconds (or `max_batch`
+operations) and written in a single transaction, with consecutive operations
+of the same shape sent as one executemany. Each submit returns a Future that
+resolves only after the batch has committed, so an acknowledgement means the
+row is durable. Each run of same-statement operations is written under a
+savepoint; if one fails, only that run is rolled back and split in half until
+the failing operations are found, so each of them gets its own error while the
+rest of the batch commits. `on_flush(tables)` is called once per committed
+batch, e.g. to clear cached queries.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import text
+
+from db import TABLES, get_engine
+
+logger = logging.getLogger("writequeue")
+
+FLUSH_INTERVAL = 0.05   # seconds to wait for more operations before writing
+MAX_BATCH = 500
+
+
+class RowNotFound(Exception):
+    pass
+
+
+class WriteOp:
+    def __init__(self, table, kind, values=None, key=None):
+        if table not in TABLES:
+            raise ValueError(f"Unknown table '{table}'")
+        self.table = table
+        self.kind = kind          # "insert" | "update" | "delete"
+        self.values = {c: _plain(v) for c, v in (values or {}).items()}
+        self.key = _plain(key)
+        self.future = Future()
+
+    @property
+    def statement(self):
+        """SQL text; operations with equal statements can share an executemany."""
+        columns = list(self.values)
+        primary_key = TABLES[self.table]
+        if self.kind == "insert":
+            names = ", ".join(columns)
+            binds = ", ".join(f":p{i}" for i in range(len(columns)))
+            return f"INSERT INTO {self.table} ({names}) VALUES ({binds})"
+        if self.kind == "update":
+            assignments = ", ".join(f"{c} = :p{i}" for i, c in enumerate(columns))
+            return f"UPDATE {self.table} SET {assignments} WHERE {primary_key} = :key"
+        return f"DELETE FROM {self.table} WHERE {primary_key} = :key"
+
+    @property
+    def params(self):
+        params = {f"p{i}": v for i, v in enumerate(self.values.values())}
+        if self.kind != "insert":
+            params["key"] = self.key
+        return params
+
+
+def _plain(value):
+    """numpy scalars (e.g. a primary key read from a DataFrame) -> Python values the driver can bind."""
+    return value.item() if hasattr(value, "item") else value
+
+
+class WriteQueue:
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH, on_flush=None):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.on_flush = on_flush
+        self.stats = {"operations": 0, "batches": 0, "failed": 0}
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._worker.start()
+
+    # --- Submitting ---
+    def submit(self, op):
+        self._queue.put(op)
+        return op.future
+
+    def insert(self, table, values):
+        return self.submit(WriteOp(table, "insert", values=values))
+
+    def update(self, table, key, values):
+        return self.submit(WriteOp(table, "update", values=values, key=key))
+
+    def delete(self, table, key):
+        return self.submit(WriteOp(table, "delete", key=key))
+
+    # --- Worker ---
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._flush(batch)
+            except Exception as e:
+                logger.exception("write batch failed")
+                for op in batch:
+                    if not op.future.done():
+                        op.future.set_exception(e)
+
+    def _flush(self, batch):
+        errors = {}
+        with get_engine().begin() as conn:
+            for group in _groups(batch):
+                self._write_group(conn, group, errors)
+
+        self.stats["operations"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["failed"] += len(errors)
+        # Invalidate before acknowledging, so a session that reruns on its ack reads fresh data
+        if self.on_flush:
+            try:
+                self.on_flush({op.table for op in batch})
+            except Exception:
+                logger.exception("on_flush failed; cached queries may be stale")
+        for op in batch:
+            if op in errors:
+                op.future.set_exception(errors[op])
+            else:
+                op.future.set_result(True)
+
+    def _write_group(self, conn, ops, errors):
+        """Write a run of same-statement operations under a savepoint.
+
+        If the run fails, only it is rolled back, and it is split in half until
+        the failing operations are found; each of those gets its own error.
+        """
+        try:
+            with conn.begin_nested():
+                result = conn.execute(text(ops[0].statement), [op.params for op in ops])
+                if ops[0].kind != "insert" and result.rowcount < len(ops):
+                    op = ops[0]
+                    raise RowNotFound(f"No row in {op.table} with {TABLES[op.table]} = {op.key}" if len(ops) == 1
+                                      else "a keyed row was not found")
+        except Exception as e:
+            if len(ops) == 1:
+                errors[ops[0]] = e
+                return
+            logger.info("%d operations failed (%s); splitting them to find the failing ones", len(ops), type(e).__name__)
+            middle = len(ops) // 2
+            self._write_group(conn, ops[:middle], errors)
+            self._write_group(conn, ops[middle:], errors)
+
+
+def _groups(batch):
+    """Split a batch into runs of consecutive operations with the same statement."""
+    groups = []
+    for op in batch:
+        if groups and groups[-1][0].statement == op.statement:
+            groups[-1].append(op)
+        else:
+            groups.append([op])
+    return groups